@@ -1,5 +1,6 @@
 """Main program implementation."""
 import argparse
+import functools
 import importlib.resources as pkg_resources
 import os
 import sys
@@ -11,37 +12,90 @@ from ._meta import __version__  # noqa: F401
 from .frontend import BasicFrontend, TerminalFrontend
 
 
-def handle_prompt(tty: BasicFrontend, pdflatex: pexpect.spawn):
+def handle_prompt(tty: BasicFrontend, pdflatex: pexpect.spawn, pending: str) -> bool:
     """Check if pdflatex has prompted for user input and if so handle it.
 
     If the "? " prompt is detected, prompt the user for a command (or Ctrl+C or
     Ctrl+D) and pass their response to pdflatex.
+
+    Args:
+        tty: Frontend to prompt the user with.
+        pdflatex: Running pdflatex process.
+        pending: Output read since the last newline.
+
+    Returns:
+        Whether a prompt was handled, in which case `pending` has been used up.
     """
-    if pdflatex.buffer != "? ":
+    if pending != "? ":
         # It's not waiting for input
-        return
-    try:
-        prompt = pdflatex.read(2)
-    except pexpect.exceptions.TIMEOUT:
-        # It's not waiting for input
-        return
+        return False
+    prompt = pending
     while True:
         # pdflatex needs a newline after Ctrl+C, so loop until we get a proper
         # response from the user
         try:
             user_response = tty.input(prompt)
             pdflatex.send(user_response + "\n")
-            return
+            return True
         except EOFError:
             # Ctrl+D at input prompt (pdflatex responds immediately)
             pdflatex.sendcontrol("d")
-            return
+            return True
         except KeyboardInterrupt:
             # Ctrl+C at input prompt (pdflatex responds at end of line)
             pdflatex.sendintr()
             prompt = ""
 
 
+def filter_output(tty: BasicFrontend, pdflatex: pexpect.spawn):
+    """Print pdflatex's output through the frontend until it exits.
+
+    Args:
+        tty: Frontend to print output with (and prompt the user with).
+        pdflatex: Running pdflatex process.
+    """
+    # Read whatever output is available and split it into lines here, rather than
+    # using pdflatex.readline() which runs pexpect's expect machinery for every line
+    # Output since the last newline, in the pieces it was read in
+    pending: List[str] = []
+    # Look these up once rather than on every chunk/line
+    read_size = pdflatex.maxread
+    read_nonblocking = pdflatex.read_nonblocking
+    tty_print = tty.print
+    while True:
+        try:
+            chunk = read_nonblocking(read_size)
+        except pexpect.exceptions.TIMEOUT:
+            # Check if it's waiting for input
+            if handle_prompt(tty, pdflatex, "".join(pending)):
+                pending.clear()
+            continue
+        except pexpect.exceptions.EOF:
+            break
+
+        # Only search the new chunk for newlines, so a long unfinished line isn't
+        # copied and searched again every time more of it arrives
+        *lines, tail = chunk.split("\n")
+        if lines:
+            lines[0] = "".join(pending) + lines[0]
+            pending.clear()
+        if tail:
+            pending.append(tail)
+        for line in lines:
+            # TODO: Page numbers would work better if it parsed the line bit by bit
+            tty_print(line.rstrip("\r"))
+        # Write out everything from this chunk at once
+        tty.flush()
+
+        # TODO: If you add a 0.1s delay here, it sometimes misses a bit of output at the
+        #       end.  Could be related to pexpect/pexpect#120 or
+        #       https://pexpect.readthedocs.io/en/stable/commonissues.html#truncated-output-just-before-child-exits
+    if pending:
+        # Last line didn't end in a newline
+        tty.print("".join(pending).rstrip("\r"))
+        tty.flush()
+
+
 def run_command(cmd: List[str], **kwargs):
     """Run the command, filtering and colouring its output.
 
@@ -60,29 +114,20 @@ def run_command(cmd: List[str], **kwargs):
     # exactly) Latin-1 and definitely not UTF-8, so interpret it as latin-1 to
     # avoid UnicodeDecodeErrors
     # TODO: make this an option
-    pdflatex = pexpect.spawn(cmd[0], cmd[1:], env=env, encoding="latin-1", timeout=0.2)
+    # Read up to 64 KiB at a time (instead of pexpect's default 2000 bytes), so bursts
+    # of output are handled in a few large reads
+    pdflatex = pexpect.spawn(
+        cmd[0], cmd[1:], env=env, encoding="latin-1", timeout=0.2, maxread=65536
+    )
 
     tty = TerminalFrontend(**kwargs)
     # tty = BasicFrontend(quiet=quiet)
-    tty.log("QuieTeX enabled")
-
-    while True:
-        try:
-            line = pdflatex.readline()
-        except pexpect.exceptions.TIMEOUT:
-            # Check if it's waiting for input
-            handle_prompt(tty, pdflatex)
-            continue
-        if line == "":
-            # EOF
-            break
-
-        # TODO: Page numbers would work better if it parsed the line bit by bit
-        tty.print(line.strip("\r\n"))
-
-        # TODO: If you add a 0.1s delay here, it sometimes misses a bit of output at the
-        #       end.  Could be related to pexpect/pexpect#120 or
-        #       https://pexpect.readthedocs.io/en/stable/commonissues.html#truncated-output-just-before-child-exits
+    try:
+        tty.log("QuieTeX enabled")
+        filter_output(tty, pdflatex)
+    finally:
+        # Remove the resize handler even if reading the output fails
+        tty.close()
 
     # TODO: Only add newline when necessary
     print()
@@ -92,16 +137,18 @@ def run_command(cmd: List[str], **kwargs):
         sys.exit(pdflatex.exitstatus)
 
 
-def print_latexmkrc(cmd, force=False):
-    """Print latexmk configuration for using QuieTeX."""
+@functools.lru_cache(maxsize=None)
+def render_latexmkrc(cmd, force=False) -> str:
+    """Return latexmk configuration for using QuieTeX (cached)."""
     template = pkg_resources.read_text("quietex", "latexmkrc")
     start, no_force_clause, force_clause, end = template.split("# <split>\n")
-    print(start, end="")
-    if force:
-        print(force_clause % dict(cmd=cmd), end="")
-    else:
-        print(no_force_clause % dict(cmd=cmd), end="")
-    print(end, end="")
+    clause = force_clause if force else no_force_clause
+    return start + clause % dict(cmd=cmd) + end
+
+
+def print_latexmkrc(cmd, force=False):
+    """Print latexmk configuration for using QuieTeX."""
+    print(render_latexmkrc(cmd, force), end="")
 
 
 def split_argv(argv: List[str]):
@@ -1,6 +1,8 @@
 """Handle formatting tokens."""
 # pylint: disable=redefined-builtin
 
+import functools
+
 import blessings
 from pygments import format
 from pygments.formatter import Formatter
@@ -10,6 +12,12 @@ from .lexer import *
 __all__ = ["AnsiTerminalFormatter", "contains_error", "format", "quiet_filter"]
 
 
+@functools.lru_cache(maxsize=None)
+def _default_terminal():
+    """Return a blessings Terminal for stdout, shared between formatters."""
+    return blessings.Terminal()
+
+
 def contains_error(token_source):
     """Return whether a list of tokens contains an error token."""
     for token_type, _ in token_source:
@@ -23,7 +31,7 @@ def quiet_filter(token_source):
     return [
         (token_type, value)
         for (token_type, value) in token_source
-        if IO not in (token_type, token_type.parent) and token_type != UI.Message
+        if not (token_type is IO or token_type.parent is IO or token_type is UI.Message)
     ]
 
 
@@ -33,9 +41,9 @@ class AnsiTerminalFormatter(Formatter):
     def __init__(self, terminal=None):
         super().__init__()
         if terminal is None:
-            terminal = blessings.Terminal()
+            terminal = _default_terminal()
 
-        self.style = {
+        styles = {
             IO.CloseFile: terminal.dim,
             IO.OpenFile: terminal.dim,
             IO.ReadAux: terminal.dim,
@@ -46,14 +54,35 @@ class AnsiTerminalFormatter(Formatter):
             UI.Status: terminal.blue,
             UI.Message: terminal.dim,
         }
+        # Resolve each style to the escape sequences which go before and after a token
+        # once, instead of calling the blessings formatting string for every token (if
+        # the terminal doesn't support styling, these are all empty)
+        normal = str(terminal.normal)
+        self.style = {
+            token_type: (str(style), normal) for token_type, style in styles.items()
+        }
+
+    def format_to_str(self, token_source):
+        """Format a list of tokens and return the result.
+
+        This does the same as `format(token_source, self)`, without going through
+        Pygments' output file handling.
+        """
+        style = self.style
+        parts = []
+        for token_type, value in token_source:
+            token_style = style.get(token_type)
+            if token_style is not None:
+                prefix, suffix = token_style
+                value = f"{prefix}{value}{suffix}"
+            parts.append(value)
+        output = "".join(parts)
+        assert "\n" not in output
+        return output
 
     def format_unencoded(self, token_source, outfile):
         """Format a list of tokens.
 
         Called internally by Formatter.format.
         """
-        for token_type, value in token_source:
-            assert "\n" not in value
-            if token_type in self.style:
-                value = self.style[token_type](value)
-            outfile.write(value)
+        outfile.write(self.format_to_str(token_source))
@@ -4,24 +4,59 @@ Author: Matthew Edwards
 Date: August 2019
 """
 import shutil
+import signal
 import sys
-from typing import Any, List, Tuple
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
 
-# pylint: disable=redefined-builtin
-from .formatter import AnsiTerminalFormatter, contains_error, format, quiet_filter
+from .formatter import AnsiTerminalFormatter, contains_error, quiet_filter
 from .lexer import UI, LatexLogLexer, lex
 from .status import AppState
 
 
-class BasicFrontend:
+class BasicFrontend:  # pylint: disable=too-many-instance-attributes
     """Handle input and output with optional colour but no cursor movement."""
 
+    # Maximum number of highlighted status bars to remember
+    STATUS_CACHE_SIZE = 64
+    # Maximum number of lexed and highlighted lines to remember
+    LINE_CACHE_SIZE = 4096
+    # Longer lines aren't remembered (they rarely repeat and can be any length)
+    LINE_CACHE_MAX_LENGTH = 1000
+
     def __init__(self, quiet=False, bell_on_error=False):
-        self.quiet = quiet
-        self.bell_on_error = bell_on_error
+        self._quiet = quiet
+        self._bell_on_error = bell_on_error
         self.state = AppState()
         self.lexer = LatexLogLexer()
         self.formatter = AnsiTerminalFormatter()
+        self._buffer: List[str] = []
+        # Status bars printed so far, and the same with highlighting
+        self._status_cache: Dict[str, str] = {}
+        # Recent lines, with their tokens, highlighted output, and visible length
+        self._line_cache: Dict[str, Tuple[List[Tuple[Any, str]], str, int]] = {}
+
+    @property
+    def quiet(self):
+        """Whether to hide file and message output."""
+        return self._quiet
+
+    @quiet.setter
+    def quiet(self, quiet):
+        # Cached lines were highlighted with the old setting
+        self._line_cache.clear()
+        self._quiet = quiet
+
+    @property
+    def bell_on_error(self):
+        """Whether to ring the bell when an error is printed."""
+        return self._bell_on_error
+
+    @bell_on_error.setter
+    def bell_on_error(self, bell_on_error):
+        self._line_cache.clear()
+        self._bell_on_error = bell_on_error
 
     def _input(self, raw_prompt):
         """Display a prompt and return the user's input."""
@@ -29,39 +64,81 @@ class BasicFrontend:
 
     def input(self, prompt):
         """Display a prompt (with highlighting) and return the user's input."""
-        return self._input(format([(UI.Prompt, prompt)], self.formatter))
+        self.flush()
+        return self._input(self.formatter.format_to_str([(UI.Prompt, prompt)]))
 
     def _write(self, raw_value):
-        """Write directly to the underlying output.
+        """Queue a string to be written to the underlying output on the next flush."""
+        self._buffer.append(raw_value)
+
+    def flush(self):
+        """Write everything printed so far to the underlying output in one go.
 
-        Returns:
-            int: number of characters written.
+        Printing lines only queues them, so that a batch of lines can be written at
+        once; logging and prompting for input flush automatically.
         """
-        sys.stdout.write(raw_value)
-        sys.stdout.flush()  # Make sure lines without newlines are printed
+        if self._buffer:
+            sys.stdout.write("".join(self._buffer))
+            self._buffer.clear()
+            sys.stdout.flush()  # Make sure lines without newlines are printed
 
-    def _print_tokens(self, tokens: List[Tuple[Any, str]], end="\n"):
-        """Highlight and print a list of tokens, updating app state if necessary."""
+    def _render_tokens(self, tokens: List[Tuple[Any, str]], end="\n"):
+        """Highlight a list of tokens, returning the output and its visible length."""
         if not tokens:
             # Make sure blank lines get printed
-            self._write(end)
-            return 0
+            return end, 0
         if self.quiet:
             tokens = quiet_filter(tokens)
         if self.bell_on_error and contains_error(tokens):
             end += "\a"
-        if tokens:
+        if not tokens:
             # Skip line if it's now empty to avoid lone newline
-            self._write(format(tokens, self.formatter) + end)
-        length = len("".join(value for (_, value) in tokens))
+            return "", 0
+        length = sum(len(value) for (_, value) in tokens)
+        return self.formatter.format_to_str(tokens) + end, length
+
+    def _print_tokens(self, tokens: List[Tuple[Any, str]], end="\n"):
+        """Highlight and print a list of tokens, returning the visible length."""
+        output, length = self._render_tokens(tokens, end)
+        if output:
+            self._write(output)
         return length
 
+    def _print_line(self, value: str):
+        """Lex, highlight, and print a line, returning its tokens and visible length."""
+        # LaTeX output repeats itself a lot (blank lines, warnings, font and image
+        # messages), so remember recent lines rather than lexing them again
+        cached = self._line_cache.get(value)
+        if cached is None:
+            tokens = lex(value, self.lexer)
+            cached = (tokens, *self._render_tokens(tokens))
+            if len(value) <= self.LINE_CACHE_MAX_LENGTH:
+                if len(self._line_cache) >= self.LINE_CACHE_SIZE:
+                    self._line_cache.clear()
+                self._line_cache[value] = cached
+        tokens, output, length = cached
+        if output:
+            self._write(output)
+        return tokens, length
+
+    def _format_status(self, status):
+        # The status bar is reprinted after every line but only switches between a few
+        # values (e.g., while an image is read), so highlight each one once
+        formatted = self._status_cache.get(status)
+        if formatted is None:
+            if len(self._status_cache) >= self.STATUS_CACHE_SIZE:
+                self._status_cache.clear()
+            formatted = self.formatter.format_to_str([(UI.Status, status)])
+            self._status_cache[status] = formatted
+        return formatted
+
     def _print_status(self, status, end="\n"):
-        self._print_tokens([(UI.Status, status)], end=end)
+        self._write(self._format_status(status) + end)
 
     def log(self, message):
         """Print a log message."""
         self._print_tokens([(UI.Message, message)])
+        self.flush()
 
     def print(self, value: str, finished=True):
         """Lex, highlight, and print a line of LaTeX compiler output.
@@ -72,14 +149,62 @@ class BasicFrontend:
         """
         if not finished:
             return
-        tokens = lex(value, self.lexer)
-        self._print_tokens(tokens)
+        tokens, _ = self._print_line(value)
         new_state = self.state.update(tokens)
-        if new_state != self.state:
+        if new_state is not self.state:
             self._print_status(new_state.format_status())
             self.state = new_state
 
 
+class _ResizeWatcher:
+    """Forget frontends' cached terminal widths when the terminal is resized.
+
+    One SIGWINCH handler is shared by every frontend. It is installed when a frontend
+    starts watching, chains to the handler it replaced, and is removed again when the
+    last frontend is closed. Frontends are only weakly referenced, so one which is
+    never closed doesn't stay alive (or add to the handler) after it is gone.
+    """
+
+    def __init__(self):
+        self.frontends: "weakref.WeakSet[TerminalFrontend]" = weakref.WeakSet()
+        self.previous_handler: Any = None
+        # Keep the bound method so it can be recognised once installed
+        self.handler = self._on_resize
+        # Whether the previous handler is running, in case it calls this one
+        self._chaining = False
+
+    def _on_resize(self, signum, frame):
+        for frontend in list(self.frontends):
+            frontend._terminal_width = None  # pylint: disable=protected-access
+        if callable(self.previous_handler) and not self._chaining:
+            self._chaining = True
+            try:
+                self.previous_handler(signum, frame)
+            finally:
+                self._chaining = False
+
+    def add(self, frontend):
+        """Start watching for resizes for a frontend (from the main thread)."""
+        if signal.getsignal(signal.SIGWINCH) is not self.handler:
+            self.previous_handler = signal.signal(signal.SIGWINCH, self.handler)
+        self.frontends.add(frontend)
+
+    def discard(self, frontend):
+        """Stop watching for a frontend, removing the handler after the last one."""
+        self.frontends.discard(frontend)
+        # Leave the handler alone if another one has been installed on top of it
+        if not self.frontends and signal.getsignal(signal.SIGWINCH) is self.handler:
+            previous = self.previous_handler
+            if previous is None:
+                # Previous handler wasn't installed from Python
+                previous = signal.SIG_DFL
+            signal.signal(signal.SIGWINCH, previous)
+            self.previous_handler = None
+
+
+_RESIZE_WATCHER = _ResizeWatcher()
+
+
 class TerminalFrontend(BasicFrontend):
     """Handle input and output with cursor movement and optional colour."""
 
@@ -91,28 +216,72 @@ class TerminalFrontend(BasicFrontend):
         super().__init__(*args, **kwargs)
         self.keep_last_status = False
         self.last_line_length = None
+        # Status bar which has been queued but not yet written, see flush
+        self._pending_status: Optional[str] = None
+        # Looking up the terminal size is a syscall, so only do it again after the
+        # terminal is resized (where the platform tells us, and only on the main thread
+        # since that's the only place signal handlers can be installed)
+        self._terminal_width: Optional[int] = None
+        self._watching_resize = (
+            hasattr(signal, "SIGWINCH")
+            and threading.current_thread() is threading.main_thread()
+        )
+        if self._watching_resize:
+            _RESIZE_WATCHER.add(self)
+
+    def close(self):
+        """Stop watching for terminal resizes.
+
+        Must be called from the main thread, like the constructor.
+        """
+        if self._watching_resize:
+            self._watching_resize = False
+            self._terminal_width = None
+            _RESIZE_WATCHER.discard(self)
 
     def _get_terminal_width(self):
-        return shutil.get_terminal_size().columns
+        width = self._terminal_width
+        if width is None:
+            width = shutil.get_terminal_size().columns
+            if self._watching_resize:
+                self._terminal_width = width
+        return width
+
+    def _queue_status(self, status):
+        """Display the status bar at the next flush unless it is replaced first."""
+        self._pending_status = self._format_status(status)
+
+    def flush(self):
+        """Write everything printed so far, followed by the latest status bar."""
+        if self._pending_status is not None:
+            self._write(self._pending_status)
+            self._pending_status = None
+        super().flush()
 
     def _clear_status(self):
         """Clear the status bar (unless marked keep) and last line (if not finished)."""
+        pending_status, self._pending_status = self._pending_status, None
         if self.keep_last_status:
             # Finish status line first
-            self._write("\n")
+            self._write((pending_status or "") + "\n")
             self.keep_last_status = False
-        else:
+        elif pending_status is None:
             last_status_length = len(self.state.format_status())
-            # Status bar doesn't end in a newlineClear status bar first
-            self._write(self.CURSOR_TO_START + self.DELETE_WHOLE_LINE)
-            # Clear previous lines if the status bar is more than one line long
-            for _ in range(last_status_length // self._get_terminal_width()):
-                self._write(self.CURSOR_UP + self.DELETE_WHOLE_LINE)
+            # Status bar doesn't end in a newline, so clear the current line first, then
+            # previous lines if the status bar is more than one line long
+            wrapped_lines = last_status_length // self._get_terminal_width()
+            self._write(
+                self.CURSOR_TO_START
+                + self.DELETE_WHOLE_LINE
+                + (self.CURSOR_UP + self.DELETE_WHOLE_LINE) * wrapped_lines
+            )
+        # Otherwise the status bar was never written, so there is nothing to clear
 
-            # Also clear last line printed if it wasn't finished
-            if self.last_line_length:
-                for _ in range(self.last_line_length // self._get_terminal_width() + 1):
-                    self._write(self.CURSOR_UP + self.DELETE_WHOLE_LINE)
+        # Also clear last line printed if it wasn't finished (never the case when the
+        # last status is kept)
+        if self.last_line_length:
+            lines = self.last_line_length // self._get_terminal_width() + 1
+            self._write((self.CURSOR_UP + self.DELETE_WHOLE_LINE) * lines)
 
     def input(self, *args, **kwargs):  # pylint: disable=arguments-differ
         """Display a prompt with the given style and return the user's input.
@@ -127,19 +296,19 @@ class TerminalFrontend(BasicFrontend):
         """Print a log message."""
         self._clear_status()
         super().log(message)
-        self._print_status(self.state.format_status(), end="")
+        self._queue_status(self.state.format_status())
+        self.flush()
 
     def print(self, value="", finished=True):  # pylint: disable=arguments-differ
         """Lex, highlight, and print a line of LaTeX compiler output."""
         self._clear_status()
-        tokens = lex(value, self.lexer)
-        length = self._print_tokens(tokens)
+        tokens, length = self._print_line(value)
         new_state = self.state.update(tokens)
-        self._print_status(new_state.format_status(), end="")
+        self._queue_status(new_state.format_status())
         if finished:
             self.last_line_length = None
         else:
             self.last_line_length = length
-        if finished and new_state != self.state:
+        if finished and new_state is not self.state:
             self.state = new_state
             self.keep_last_status = True
@@ -18,6 +18,8 @@ class LatexLogLexer(RegexLexer):
     """Lexer for a single line (or section thereof) of LaTeX compiler log output."""
 
     name = "LatexLog"
+    # As for Splitter.SPLIT_RE, match \d and \s in (cheaper) ASCII mode
+    flags = re.MULTILINE | re.ASCII
 
     START_PAGE_RE = r"\[\d+\s?"
     OPEN_FILE_RE = r"\(\.?/[^\s(){}]+"
@@ -27,23 +29,29 @@ class LatexLogLexer(RegexLexer):
 
     def text_and_close_files(self, match):
         """Callback to lex text followed by close-files."""
-        tokens = []
         text = match.group()
-        if text.count("(") != text.count(")"):
-            # Split trailing spaces into a separate token
-            # TODO: use bygroups for this instead?
-            text_stripped = text.rstrip(" ")
-            if text_stripped != text:
-                start = len(text_stripped)
-                tokens.append((match.start() + start, Text, text[start:]))
-                text = text_stripped
-
-            # Split trailing close-files into separate tokens
-            while text.endswith(")") and text.count("(") < text.count(")"):
-                text = text[:-1]
-                tokens.insert(0, (match.start() + len(text), IO.CloseFile, ")"))
-        if text:
-            tokens.insert(0, (0, Text, text))
+        start = match.start()
+        opens = text.count("(")
+        closes = text.count(")")
+        if opens == closes:
+            return [(start, Text, text)]
+
+        # Split trailing spaces into a separate token
+        text_stripped = text.rstrip(" ")
+        text_end = len(text_stripped)
+        # Split trailing close-files into separate tokens, but only as many as there are
+        # unmatched close brackets (using rstrip rather than a loop to find them)
+        end = text_end
+        if closes > opens:
+            end = max(len(text_stripped.rstrip(")")), text_end - (closes - opens))
+
+        # Build the tokens in order, rather than inserting each one at the front
+        tokens = [(start, Text, text[:end])] if end else []
+        tokens.extend(
+            (start + index, IO.CloseFile, ")") for index in range(end, text_end)
+        )
+        if text_end < len(text):
+            tokens.append((start + text_end, Text, text[text_end:]))
         return tokens
 
     tokens = {
@@ -83,48 +91,35 @@ class LatexLogLexer(RegexLexer):
     }
 
 
+# Shared lexer for lex() calls which don't pass one (it keeps no state between calls)
+_DEFAULT_LEXER = LatexLogLexer()
+
+
 class Splitter:
     """Utility class for splitting lines of log output."""
 
     # TODO: roll this into the lexer?
 
-    PAGE_RE = re.compile(LatexLogLexer.START_PAGE_RE)
-    FILE_RE = re.compile(LatexLogLexer.OPEN_FILE_RE)
-
-    @staticmethod
-    def split_on_re(regex, value):
-        """Split a string into sections starting with a given regex."""
-        last_index = 0
-        for match in regex.finditer(value):
-            section = value[last_index : match.start()]
-            if section:
-                yield section
-                last_index = match.start()
-        section = value[last_index:]
-        if section:
-            yield section
-
-    @classmethod
-    def split_on_pages(cls, line):
-        """Split a line of output into sections starting with a page number."""
-        return cls.split_on_re(cls.PAGE_RE, line)
-
-    @classmethod
-    def split_on_io(cls, line):
-        """Split a line of output into sections starting with a file opening."""
-        return cls.split_on_re(cls.FILE_RE, line)
+    # Matches (with zero width) wherever a start-page or file-open begins, so a line can
+    # be split on both in one pass.  The file-open has to have at least one character of
+    # filename before any start-page, since that's where the line is split.  pdflatex
+    # output is almost all ASCII, and \d and \s are cheaper to match in ASCII mode.
+    SPLIT_RE = re.compile(r"(?=\[\d)|(?=\(\.?/(?!\[\d)[^\s(){}])", re.ASCII)
 
     @classmethod
     def split(cls, line):
         """Split a line of output by start-page or file-open.
 
-        Yields:
+        Returns:
             List[str]: sections of the line, each (other than the first) starting with a
             start-page or file-open.
         """
-        for section in cls.split_on_pages(line):
-            for section_ in cls.split_on_io(section):
-                yield section_
+        if "[" not in line and "(" not in line:
+            # Nothing to split on, so don't bother with the regex
+            return [line] if line else []
+        # SPLIT_RE only matches empty strings, so re.split keeps all the text and the
+        # only empty section is a leading one (if the line starts with a split point)
+        return [section for section in cls.SPLIT_RE.split(line) if section]
 
 
 def split(line) -> List[str]:
@@ -137,14 +132,23 @@ def split(line) -> List[str]:
     return list(Splitter.split(line))
 
 
-def _lex(line: str, lexer: LatexLogLexer):
-    """Lex a single line of output.
+# Characters which can start a token other than text (one character class search is
+# about twice as fast as looking for each character in turn)
+_SPECIAL_CHAR_RE = re.compile(r"[!(\[{<)]")
+
+
+def _is_plain_text(line: str) -> bool:
+    """Return whether a line of output would be lexed as nothing but text.
 
-    Yields: (tokentype, value)
+    This is a cheap check to let most lines skip the lexer, so it needs to be kept
+    consistent with the rules in LatexLogLexer.
     """
-    for section in Splitter.split(line):
-        for token in lexer.get_tokens(section):
-            yield token
+    return not (
+        _SPECIAL_CHAR_RE.search(line)
+        or "arning" in line
+        or "ATTENTION" in line
+        or line.startswith(("Overfull", "Underfull"))
+    )
 
 
 def lex(line: str, lexer: LatexLogLexer = None) -> List[Tuple[Any, str]]:
@@ -152,6 +156,17 @@ def lex(line: str, lexer: LatexLogLexer = None) -> List[Tuple[Any, str]]:
 
     Returns: list of (tokentype, value)
     """
+    if _is_plain_text(line):
+        return [(Text, line)] if line else []
     if not lexer:
-        lexer = LatexLogLexer()
-    return list(_lex(line, lexer))
+        lexer = _DEFAULT_LEXER
+    # Collect each section's tokens straight into the list, rather than passing every
+    # token through another generator.  Sections never contain newlines or need tabs
+    # expanding, so skip get_tokens' preprocessing and call the lexer directly.
+    tokens: List[Tuple[Any, str]] = []
+    get_tokens = lexer.get_tokens_unprocessed
+    for section in Splitter.split(line):
+        tokens.extend(
+            (token_type, value) for (_, token_type, value) in get_tokens(section)
+        )
+    return tokens
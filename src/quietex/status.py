@@ -1,5 +1,6 @@
 """Manage application state and status bar."""
 
+import sys
 from typing import List, Optional
 
 import attr
@@ -7,13 +8,18 @@ from attr import attrs
 
 from .lexer import IO, State
 
+# Token types which can change the application state
+_STATE_TOKENS = frozenset((State.StartPage, IO.OpenFile, IO.CloseFile))
 
-@attrs(auto_attribs=True, frozen=True)
+
+@attrs(auto_attribs=True, frozen=True, slots=True)
 class AppState:
     """Manage application state and status bar."""
 
     current_page: Optional[int] = None
     file_stack: List[str] = attr.Factory(list)
+    # Cached result of format_status, which is called several times per line
+    _status: Optional[str] = attr.ib(default=None, init=False, eq=False, repr=False)
 
     @property
     def current_file(self):
@@ -23,27 +29,45 @@ class AppState:
         return None
 
     def update(self, token_source):
-        """Update current file and page based on tokens to print."""
+        """Update current file and page based on tokens to print.
+
+        Returns: the new state, or this state itself if nothing changed (so states
+            can be compared with `is`).
+        """
         next_page = self.current_page
-        next_stack = self.file_stack.copy()
+        # Only copy the file stack once a token actually changes it
+        next_stack = self.file_stack
         for token_type, value in token_source:
+            if token_type not in _STATE_TOKENS:
+                # Most tokens don't affect the state, so skip them with one lookup
+                continue
             if token_type == State.StartPage:
-                next_page = int(value.strip("[] "))
-            elif token_type == IO.OpenFile:
-                next_stack.append(value.strip("("))
-            elif token_type == IO.CloseFile:
-                try:
-                    next_stack.pop()
-                except IndexError:
-                    pass
+                # The lexer guarantees values look like "[12" or "[12 ", and int()
+                # ignores the whitespace
+                next_page = int(value[1:])
+                continue
+            if next_stack is self.file_stack:
+                next_stack = next_stack.copy()
+            if token_type == IO.OpenFile:
+                # Interned so comparing file stacks is mostly identity checks
+                next_stack.append(sys.intern(value[1:]))
+            elif next_stack:
+                # Ignore unbalanced close-files
+                next_stack.pop()
+        if next_page == self.current_page and next_stack == self.file_stack:
+            return self
         return AppState(next_page, next_stack)
 
     def format_status(self):
         """Return the current status bar as a string, and reset dirtiness."""
-        status = ""
-        if self.current_page:
-            status += f"[{self.current_page}]"
+        if self._status is not None:
+            return self._status
+        parts = []
+        if self.current_page is not None:
+            parts.append(f"[{self.current_page}]")
         if self.current_file:
-            status += f" ({self.current_file})"
-            status = status.strip(" ")
+            parts.append(f"({self.current_file})")
+        status = " ".join(parts)
+        # The state is frozen, so this is the only way to set the cache
+        object.__setattr__(self, "_status", status)
         return status
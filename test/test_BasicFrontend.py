@@ -5,6 +5,7 @@ import io
 from typing import List
 
 from quietex.frontend import BasicFrontend
+from quietex.lexer import lex
 
 
 class StringBasicFrontend(BasicFrontend):
@@ -137,3 +138,54 @@ def test_print_partial():
     frontend = StringBasicFrontend()
     frontend.print("test", finished=False)
     assert frontend.output == ""
+
+
+def test_stdout_written_on_flush(capsys):
+    """Test that printed lines are queued until the frontend is flushed."""
+    frontend = BasicFrontend()
+    frontend.print("(./test.tex [1]")
+    frontend.print("test")
+    assert capsys.readouterr().out == ""
+    frontend.flush()
+    assert capsys.readouterr().out == "(./test.tex [1]\n[1] (./test.tex)\ntest\n"
+    assert not frontend._buffer  # pylint: disable=protected-access
+
+
+def test_repeated_line_lexed_once(monkeypatch):
+    """Test that repeated lines are printed from the cache."""
+    calls = []
+    monkeypatch.setattr(
+        "quietex.frontend.lex", lambda *args: calls.append(args) or lex(*args)
+    )
+    frontend = StringBasicFrontend()
+    frontend.print("(./test.tex [1]")
+    frontend.print("(./test.tex [1]")
+    assert len(calls) == 1
+    frontend.assert_display_like(
+        [
+            "(./test.tex [1]",
+            "[1] (./test.tex)",
+            "(./test.tex [1]",
+            "[1] (./test.tex)",
+            "",
+        ]
+    )
+
+
+def test_long_line_not_cached():
+    """Test that lines too long to be worth remembering aren't cached."""
+    frontend = StringBasicFrontend()
+    frontend.print("x" * (BasicFrontend.LINE_CACHE_MAX_LENGTH + 1))
+    frontend.print("test")
+    assert list(frontend._line_cache) == ["test"]  # pylint: disable=protected-access
+
+
+def test_changing_options_clears_line_cache():
+    """Test that lines aren't printed from the cache after the options change."""
+    frontend = StringBasicFrontend()
+    frontend.print("(./test.tex)")
+    frontend.quiet = True
+    frontend.print("(./test.tex)")
+    frontend.bell_on_error = True
+    frontend.print("! Error")
+    frontend.assert_display_like(["(./test.tex)", "! Error", "\a"])
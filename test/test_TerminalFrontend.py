@@ -1,11 +1,17 @@
 """Tests for TerminalFrontend."""
-# pylint: disable=protected-access,invalid-name
+# pylint: disable=protected-access,invalid-name,redefined-outer-name
 
+import gc
+import os
 import re
+import signal
+import threading
 from typing import Callable, List
 
 import pyte
+import pytest
 
+import quietex.frontend
 from quietex.frontend import TerminalFrontend
 from test.test_BasicFrontend import (
     EXAMPLE_OUTPUT,
@@ -61,6 +67,7 @@ class FakeTerminalFrontend(TerminalFrontend):
 
     def assert_cursor(self, x, y):  # pylint: disable=invalid-name
         """Assert the cursor is at (`x`, `y`)."""
+        self.flush()
         assert (self.screen.cursor.x, self.screen.cursor.y) == (x, y)
 
     def assert_display_like(self, lines, message=None):
@@ -70,6 +77,7 @@ class FakeTerminalFrontend(TerminalFrontend):
         `lines` is a list of strings, assert each line of the display is equal to the
         corresponding line from the list.  Line endings will be checked.
         """
+        self.flush()
         if isinstance(lines, str):
             lines = [lines]
         for i, line in enumerate(lines):
@@ -160,6 +168,20 @@ def test_print_multiple_lines_with_status():
     frontend.assert_display_like(["test1 [1]", "[1]", "test2", "test3", "[1]", ""])
 
 
+def test_status_written_on_flush():
+    """Test the status bar is only written once per flush."""
+    frontend = FakeTerminalFrontend()
+    written = []
+    frontend._write = written.append
+    frontend.print("test1 [1]")
+    written.clear()
+    frontend.print("test2")
+    frontend.print("test3")
+    assert written == ["[1]\n", "test2\n", "test3\n"]
+    frontend.flush()
+    assert written[-1] == "[1]"
+
+
 def test_input():
     """Test faking input when no status line has been printed."""
     frontend = FakeTerminalFrontend()
@@ -287,3 +309,73 @@ def test_print_partial_complex():
     # Close first file
     frontend.print(msg)
     frontend.assert_display_like([msg, "[2]", ""])
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGWINCH"), reason="no SIGWINCH")
+def test_terminal_width_cached(monkeypatch):
+    """Test the terminal width is only looked up again after a resize."""
+    frontend = TerminalFrontend()
+    monkeypatch.setenv("COLUMNS", "100")
+    assert frontend._get_terminal_width() == 100
+    monkeypatch.setenv("COLUMNS", "120")
+    assert frontend._get_terminal_width() == 100
+    os.kill(os.getpid(), signal.SIGWINCH)
+    assert frontend._get_terminal_width() == 120
+    frontend.close()
+
+
+@pytest.fixture
+def resize_watcher(monkeypatch):
+    """Give the test its own resize watcher and restore the SIGWINCH handler after."""
+    watcher = quietex.frontend._ResizeWatcher()
+    monkeypatch.setattr(quietex.frontend, "_RESIZE_WATCHER", watcher)
+    original = signal.getsignal(signal.SIGWINCH)
+    yield watcher
+    signal.signal(signal.SIGWINCH, original)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGWINCH"), reason="no SIGWINCH")
+def test_sigwinch_handler_chained_and_restored(resize_watcher):
+    """Test the previous SIGWINCH handler is still called, and restored on close."""
+    calls = []
+
+    def previous(signum, _):
+        calls.append(signum)
+
+    signal.signal(signal.SIGWINCH, previous)
+    frontends = [TerminalFrontend(), TerminalFrontend()]
+    assert len(resize_watcher.frontends) == 2
+    os.kill(os.getpid(), signal.SIGWINCH)
+    assert calls == [signal.SIGWINCH]
+    frontends[0].close()
+    assert signal.getsignal(signal.SIGWINCH) is not previous
+    frontends[1].close()
+    assert signal.getsignal(signal.SIGWINCH) is previous
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGWINCH"), reason="no SIGWINCH")
+def test_sigwinch_handler_shared(resize_watcher):
+    """Test frontends which are never closed share one handler and aren't kept."""
+    handler = None
+    for _ in range(3000):
+        TerminalFrontend()
+        handler = handler or signal.getsignal(signal.SIGWINCH)
+        assert signal.getsignal(signal.SIGWINCH) == handler
+    gc.collect()
+    assert not resize_watcher.frontends
+    os.kill(os.getpid(), signal.SIGWINCH)
+
+
+def test_create_off_main_thread(monkeypatch):
+    """Test a frontend can be created off the main thread, without caching width."""
+    results = []
+    thread = threading.Thread(target=lambda: results.append(TerminalFrontend()))
+    thread.start()
+    thread.join()
+    assert len(results) == 1
+    frontend = results[0]
+    monkeypatch.setenv("COLUMNS", "100")
+    assert frontend._get_terminal_width() == 100
+    monkeypatch.setenv("COLUMNS", "120")
+    assert frontend._get_terminal_width() == 120
+    frontend.close()
@@ -128,5 +128,28 @@ def test_arguments_are_untouched(quietex_args, cmd_args):
     assert remove_control_sequences(output).strip() == cmd_args
 
 
+def test_line_split_across_reads():
+    """Test that a line which arrives in several pieces is printed in one piece."""
+    script = (
+        "import sys, time\n"
+        "for _ in range(5):\n"
+        "    sys.stdout.write('ab'); sys.stdout.flush(); time.sleep(0.05)\n"
+        "print()"
+    )
+    output = run(["quietex", "python", "-c", script])
+    assert remove_control_sequences(output).split() == ["ab" * 5]
+
+
+def test_prompt():
+    """Test that quietex passes a prompt response through to the command."""
+    prompt = str(Path(__file__).parent / "prompt")
+    output = subprocess.run(
+        ["quietex", prompt], input="test\n", text=True, check=True, capture_output=True
+    ).stdout
+    output = remove_control_sequences(output)
+    assert "Got test" in output
+    assert "No newline" in output
+
+
 # TODO: test passing this latin-1 string through pexpect
 # b"[]\T1/lmr/m/sc/10.95/100ls (+10) Kaartinen, H., Hyypp\xe4, J., Vas-taranta, M., Ku"
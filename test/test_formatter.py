@@ -49,6 +49,12 @@ def test_log_quiet(term):
     assert result == "text"
 
 
+def test_quiet_hides_any_io_type():
+    """Make sure every IO token type is filtered in quiet mode, not just known ones."""
+    tokens = [(IO, "io"), (IO.Other, "other"), (Text, "text")]
+    assert quiet_filter(tokens) == [(Text, "text")]
+
+
 def test_formatting_verbose(term):
     """Test formatting every kind of token in verbose mode."""
     formatter = AnsiTerminalFormatter(term)
@@ -63,3 +69,10 @@ def test_formatting_verbose(term):
         + term.yellow("warning")
     )
     assert result == expected
+
+
+def test_format_to_str(term):
+    """Test formatting straight to a string matches Pygments' format."""
+    formatter = AnsiTerminalFormatter(term)
+    assert formatter.format_to_str(EXAMPLE_TOKENS) == format(EXAMPLE_TOKENS, formatter)
+    assert formatter.format_to_str([]) == ""
@@ -4,7 +4,7 @@ from typing import Any, List, Tuple
 
 import pytest
 
-from quietex.lexer import IO, Generic, State, Text, lex, split
+from quietex.lexer import IO, Generic, LatexLogLexer, State, Text, lex, split
 
 
 def test_split():
@@ -20,6 +20,20 @@ def test_split():
     assert list(split("".join(msg))) == msg
 
 
+@pytest.mark.parametrize(
+    "msg",
+    (
+        ["(./file", "[1]"],
+        ["text (./", "[1]"],
+        ["(./file[a] ", "[1 ", "(./file2"],
+        ["[1", "(/a", "[2]", "(./b)"],
+    ),
+)
+def test_split_file_before_page(msg):
+    """Test splitting file-opens which run straight into a start-page."""
+    assert split("".join(msg)) == msg
+
+
 def combine_text(tokens):
     """Combine consecutive Text tokens."""
     # TODO: TokenMergeFilter?
@@ -69,6 +83,31 @@ def test_lex_text(msg):
     assert combine_text(lex(msg)) == [(Text, msg)]
 
 
+@pytest.mark.parametrize(
+    "msg",
+    (
+        "",
+        "Plain text",
+        r" restricted \write18 enabled.",
+        "Package hyperref Warning: Token not allowed",
+        "warning",
+        "** ATTENTION: Overriding command lockouts (line 45).",
+        "Overfull",
+        "[1]",
+        "(./test.tex",
+        "text)",
+        "{./aux.map}",
+        "<./image.png>",
+        "! Undefined control sequence.",
+    ),
+)
+def test_lex_plain_text_shortcut(msg):
+    """Test that lines which skip the lexer come out the same as if they were lexed."""
+    lexer = LatexLogLexer()
+    expected = [token for section in split(msg) for token in lexer.get_tokens(section)]
+    assert lex(msg) == expected
+
+
 @pytest.mark.parametrize(
     "msg",
     ("(./test.tex", "(/usr/local/texlive/2019/texmf-dist/tex/latex/base/article.cls"),
@@ -28,6 +28,12 @@ def test_format_status_page_only():
     assert state.format_status() == "[1]"
 
 
+def test_format_status_page_zero():
+    """Test formatting status bar when the current page is 0."""
+    state = AppState(current_page=0)
+    assert state.format_status() == "[0]"
+
+
 def test_format_status_file_only():
     """Test formatting status bar with only a current file."""
     state = AppState(file_stack=["./test.tex"])
@@ -59,6 +65,7 @@ def test_next_state_no_change(token):
     state = AppState()
     next_state = state.update([token])
     assert next_state == state
+    assert next_state is state
 
 
 @pytest.mark.parametrize(
@@ -100,3 +107,20 @@ def test_next_state_empty_stack(tokens):
     next_state = state.update(tokens)
     assert next_state.current_file is None
     assert next_state == state
+    assert next_state is state
+
+
+def test_next_state_unbalanced_close():
+    """Test that a close-file with no file open is ignored."""
+    state = AppState(file_stack=["./test.tex"])
+    next_state = state.update([(IO.CloseFile, ")"), (IO.CloseFile, ")")])
+    assert next_state.current_file is None
+    assert next_state.update([(IO.OpenFile, "(./a.tex")]).current_file == "./a.tex"
+
+
+def test_format_status_cached():
+    """Test the status bar is only formatted once per state."""
+    state = AppState(1, ["test.tex"])
+    assert state.format_status() == "[1] (test.tex)"
+    assert state.format_status() is state.format_status()
+    assert state == AppState(1, ["test.tex"])